@@ -1,14 +1,17 @@
 from datetime import datetime
 from random import uniform
-from ..protocol import PriceProtocol, OrderProtocol, OrderRequest, FillReport
-from typing import Optional
+from ..protocol import BatchPriceProtocol, OrderProtocol, OrderRequest, FillReport
+from typing import Dict, List, Optional
 
-class MockClient(PriceProtocol, OrderProtocol):
+class MockClient(BatchPriceProtocol, OrderProtocol):
     def __init__(self, fixed_price: Optional[float] = None):
         self.fixed_price = fixed_price
 
     def get_price(self, symbol: str) -> float:
-        return self.fixed_price or round(uniform(100, 200), 2)  # Random price
+        return float(self.fixed_price or round(uniform(100, 200), 2))  # Random price
+
+    async def get_prices(self, symbols: List[str]) -> Dict[str, float]:
+        return {symbol: self.get_price(symbol) for symbol in symbols}
 
     def submit_order(self, order: OrderRequest) -> FillReport:
         return FillReport(
@@ -1,6 +1,6 @@
 from typing import Protocol, runtime_checkable
 from dataclasses import dataclass
-from typing import Literal, Optional
+from typing import Dict, List, Literal, Optional
 from core.models import OrderStatus
 from core.orders.bracket import BracketOrder
 
@@ -13,6 +13,15 @@ class PriceProtocol(Protocol):
         ...
 
 
+@runtime_checkable
+class BatchPriceProtocol(PriceProtocol, Protocol):
+    """Price providers that can quote many symbols in one call."""
+
+    async def get_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """Returns current prices keyed by symbol; symbols without a price are omitted."""
+        ...
+
+
 @runtime_checkable
 class OrderProtocol(Protocol):
     """Interface for order execution."""
@@ -1,4 +1,6 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import json
 from threading import Lock
@@ -41,9 +43,17 @@ class QuestradeAuth:
             """, (self.brokerage_name,)).fetchone()
             return result['refresh_token'] if result else None
 
-    def _refresh_tokens(self) -> None:
-        """Refreshes access_token and updates expiry."""
+    def _refresh_tokens(self, if_expiring: bool = False, stale_token: Optional[str] = None) -> None:
+        """Refreshes access_token and updates expiry.
+
+        Re-checked under the lock so callers that queued behind an in-flight
+        refresh reuse its result instead of refreshing again.
+        """
         with self.lock:
+            if if_expiring and time.time() <= self.expiry_time - 300:
+                return  # Another caller refreshed while we waited
+            if stale_token is not None and self.access_token != stale_token:
+                return  # The rejected token has already been replaced
             response = requests.post(
                 f"{QUESTRADE_TOKEN_URL}?grant_type=refresh_token",
                 params={'refresh_token': self.refresh_token}
@@ -81,7 +91,7 @@ class QuestradeAuth:
     def get_valid_token(self) -> str:
         try:
             if time.time() > self.expiry_time - 300:
-                self._refresh_tokens()
+                self._refresh_tokens(if_expiring=True)
             return self.access_token
         except Exception as e:
             logger.critical(f"Token refresh failed: {e}")
@@ -91,10 +101,22 @@ class QuestradeAuth:
     def create_session(self) -> requests.Session:
         """Creates an authenticated requests.Session."""
         session = requests.Session()
+        # Keep TCP+TLS connections alive across calls; retry transient connect errors
+        session.mount("https://", HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(total=2, backoff_factor=0.2)
+        ))
         session.headers.update({
             'Authorization': f'Bearer {self.get_valid_token()}'
         })
         return session
+
+    def refresh_session(self, session: requests.Session) -> None:
+        """Refreshes the token a session was rejected with and updates its bearer header."""
+        stale_token = session.headers.get('Authorization', '').removeprefix('Bearer ')
+        self._refresh_tokens(stale_token=stale_token)
+        session.headers['Authorization'] = f'Bearer {self.access_token}'
     
     # Keep your existing methods (e.g., get_accounts)
     def get_accounts(self):
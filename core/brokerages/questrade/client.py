@@ -1,25 +1,87 @@
-from typing import Optional
+import asyncio
+import logging
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
 from dataclasses import asdict
-from ..protocol import PriceProtocol, OrderProtocol, OrderRequest, FillReport
+
+import requests
+
+from ..protocol import BatchPriceProtocol, OrderProtocol, OrderRequest, FillReport
 from .auth import QuestradeAuth
 from core.logger import logger
 from config.env import DRY_RUN
 
-class QuestradeClient(PriceProtocol, OrderProtocol):
+class QuestradeClient(BatchPriceProtocol, OrderProtocol):
     """Questrade implementation of the brokerage protocols."""
     
+    MAX_BACKOFF_SECONDS = 60
+    SYMBOL_BATCH_SIZE = 100  # names per v1/symbols request
+    STALE_QUOTE_SECONDS = 300  # quotes whose last trade is older than this are not tradable
+
     def __init__(self, auth: QuestradeAuth):
         self.auth = auth
         self._session = None  # Will hold authenticated Questrade API session
+        # Backoff state: consecutive failures and when the API may be tried again
+        self._fails = 0
+        self._next_try_at = 0.0
+        self._symbol_ids: Dict[str, int] = {}  # symbol -> Questrade symbolId
+
+    def _record_failure(self, retry_after: Optional[str] = None) -> None:
+        """Park the client for 2^n seconds (or Retry-After) after a failed call"""
+        self._fails += 1
+        delay = min(self.MAX_BACKOFF_SECONDS, 2 ** self._fails)
+        if retry_after:
+            try:
+                delay = min(self.MAX_BACKOFF_SECONDS, float(retry_after))
+            except ValueError:
+                pass
+        self._next_try_at = time.monotonic() + delay
+        logger.warning("Questrade API unavailable, backing off for %.0fs", delay)
+
+    def _get(self, url: str) -> requests.Response:
+        """GET against the API server, tracking network/429/5xx failures for backoff"""
+        if not self._session:
+            self._session = self.auth.create_session()
+
+        try:
+            response = self._session.get(url)
+            if response.status_code == 401:
+                # Access token expired server-side; refresh once and retry
+                self.auth.refresh_session(self._session)
+                response = self._session.get(url)
+        except requests.RequestException:
+            self._record_failure()
+            raise
+
+        if response.status_code == 429 or response.status_code >= 500:
+            self._record_failure(response.headers.get("Retry-After"))
+        elif response.ok:
+            self._fails = 0
+            self._next_try_at = 0.0
+        return response
+
+    async def ping(self) -> bool:
+        """Cheap authenticated call that keeps the pooled HTTPS connection warm."""
+        if time.monotonic() < self._next_try_at:
+            return False  # Don't poke an API we're backing off from
+        # Off the event loop so a slow ping can't stall the trading loop
+        response = await asyncio.to_thread(self._get, f"{self.auth.api_server}v1/time")
+        return response.ok
 
     # --- PriceProtocol Implementation ---
     async def get_price(self, symbol: str) -> float:
         """Fetches the current market price for a symbol like 'AAPL'."""
+        if time.monotonic() < self._next_try_at:
+            raise RuntimeError(f"Questrade API backing off, skipping quote for {symbol}")
+
         symbol_id = self.lookup_symbol_id(symbol)
 
         url = f"{self.auth.api_server}v1/markets/quotes/{symbol_id}"
-        response = self._session.get(url)
-        logger.info(f"Quote response: {response.status_code} - {response.text}")
+        response = self._get(url)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Quote response: %s - %s", response.status_code, response.text)
 
         if response.status_code != 200:
             raise RuntimeError(f"Failed to fetch quote for {symbol} (ID: {symbol_id})")
@@ -33,31 +95,111 @@ class QuestradeClient(PriceProtocol, OrderProtocol):
         if not price:
             raise RuntimeError(f"No price available for {symbol}: {quote_data}")
 
-        return price
+        return float(price)
    
+    async def get_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """Fetches current prices for many symbols, one quotes request per SYMBOL_BATCH_SIZE ids."""
+        if time.monotonic() < self._next_try_at:
+            raise RuntimeError(f"Questrade API backing off, skipping quotes for {len(symbols)} symbols")
+
+        try:
+            symbol_ids = self.lookup_symbol_ids(symbols)
+        except RuntimeError as e:
+            # Quote whatever did resolve rather than failing the whole batch
+            logger.warning("Batch symbol lookup incomplete: %s", e)
+            symbol_ids = {s: self._symbol_ids[s] for s in map(str.upper, symbols) if s in self._symbol_ids}
+
+        requested = {sys.intern(s.upper()): s for s in symbols}
+        by_id = {symbol_id: requested[symbol] for symbol, symbol_id in symbol_ids.items()}
+        ids = list(by_id)
+        prices: Dict[str, float] = {}
+
+        for start in range(0, len(ids), self.SYMBOL_BATCH_SIZE):
+            chunk = ids[start:start + self.SYMBOL_BATCH_SIZE]
+            url = f"{self.auth.api_server}v1/markets/quotes?ids={','.join(map(str, chunk))}"
+            response = self._get(url)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Batch quote response: %s - %s", response.status_code, response.text)
+
+            if response.status_code != 200:
+                raise RuntimeError(f"Failed to fetch quotes for {len(chunk)} symbols")
+
+            for quote in response.json().get("quotes", []):
+                symbol = by_id.get(quote.get("symbolId"))
+                if not symbol or not self._is_tradable(symbol, quote):
+                    continue
+                # Prefer lastTradePrice, then fallback to bid or ask
+                price = quote.get("lastTradePrice") or quote.get("bidPrice") or quote.get("askPrice")
+                if price:
+                    prices[symbol] = float(price)
+
+        return prices
+
+    def _is_tradable(self, symbol: str, quote: dict) -> bool:
+        """Rejects halted symbols and quotes whose last trade is older than STALE_QUOTE_SECONDS"""
+        if quote.get("isHalted", False):
+            logger.warning("%s trading is halted", symbol)
+            return False
+
+        last_trade_time = quote.get("lastTradeTime")
+        if last_trade_time:
+            try:
+                trade_time = datetime.fromisoformat(last_trade_time)
+            except ValueError:
+                logger.warning("Invalid timestamp for %s", symbol)
+                return True
+            if trade_time.tzinfo is None:
+                trade_time = trade_time.replace(tzinfo=timezone.utc)
+            age = (datetime.now(timezone.utc) - trade_time).total_seconds()
+            if age > self.STALE_QUOTE_SECONDS:
+                logger.warning("Stale data for %s from %s", symbol, last_trade_time)
+                return False
+        return True
+
     def lookup_symbol_id(self, symbol: str) -> int:
         """Looks up the Questrade symbolId for a given stock symbol like 'AAPL'."""
-        if not self._session:
-            self._session = self.auth.create_session()
+        symbol = sys.intern(symbol.upper())
+        symbol_id = self._symbol_ids.get(symbol)
+        if symbol_id is not None:
+            return symbol_id
+        return self.lookup_symbol_ids([symbol])[symbol]
 
-        url = f"{self.auth.api_server}v1/symbols?names={symbol}"
-        response = self._session.get(url)
-        logger.info(f"Symbol lookup response: {response.status_code} - {response.text}")
+    def lookup_symbol_ids(self, symbols: List[str]) -> Dict[str, int]:
+        """Resolves many symbols at once, one request per SYMBOL_BATCH_SIZE uncached names.
 
-        if response.status_code != 200:
-            raise RuntimeError(f"Symbol lookup failed for {symbol}")
+        Result keys are the upper-cased symbols.
+        """
+        symbols = [sys.intern(s.upper()) for s in symbols]
+        missing = [s for s in dict.fromkeys(symbols) if s not in self._symbol_ids]
 
-        data = response.json()
-        if not data["symbols"]:
-            raise RuntimeError(f"No matching symbol found for {symbol}")
+        for start in range(0, len(missing), self.SYMBOL_BATCH_SIZE):
+            chunk = missing[start:start + self.SYMBOL_BATCH_SIZE]
+            url = f"{self.auth.api_server}v1/symbols?names={','.join(chunk)}"
+            response = self._get(url)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Symbol lookup response: %s - %s", response.status_code, response.text)
+
+            if response.status_code != 200:
+                raise RuntimeError(f"Symbol lookup failed for {', '.join(chunk)}")
+
+            found = {entry["symbol"].upper(): entry["symbolId"]
+                     for entry in response.json().get("symbols", [])}
+            for symbol in chunk:
+                symbol_id = found.get(symbol)
+                if symbol_id is not None:
+                    self._symbol_ids[symbol] = symbol_id
+
+        unresolved = [s for s in symbols if s not in self._symbol_ids]
+        if unresolved:
+            raise RuntimeError(f"No matching symbol found for {', '.join(unresolved)}")
 
-        return data["symbols"][0]["symbolId"]
+        return {s: self._symbol_ids[s] for s in symbols}
 
     # --- OrderProtocol Implementation ---
     async def submit_order(self, order: OrderRequest) -> FillReport:
         """Submits an order via Questrade API or simulates it if in Dry Run mode."""
         if DRY_RUN:
-            logger.info(f"[DRY RUN] Would submit order: {order}")
+            logger.info("[DRY RUN] Would submit order: %s", order)
             return FillReport(
                 order_id="DRYRUN123",
                 filled_at=0.0,
@@ -73,16 +215,17 @@ class QuestradeClient(PriceProtocol, OrderProtocol):
             "type": order.order_type.upper(),
             "action": "Buy" if order.quantity > 0 else "Sell"
         }
-        logger.info(f"Submitting order: {questrade_order}")
+        logger.info("Submitting order: %s", questrade_order)
         
         url = f"{self.auth.api_server}v1/accounts/27348656/orders"
-        logger.info(f"Post endpoint url: {url}")
+        logger.info("Post endpoint url: %s", url)
         
         response = self._session.post(url, json=questrade_order)
         response_json = response.json()
 
-        logger.info(f"Order response text: {response.status_code} - {response.text}")
-        logger.info(f"Order response json: {response_json}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Order response text: %s - %s", response.status_code, response.text)
+        logger.info("Order response json: %s", response_json)
 
         if not response.ok or "orderId" not in response_json:
             logger.error("Order submission failed or response invalid")
@@ -106,7 +249,8 @@ class QuestradeClient(PriceProtocol, OrderProtocol):
 
         url = f"{self.auth.api_server}v1/accounts/{account_id}/balances"
         response = self._session.get(url)
-        logger.info(f"Buying power response: {response.status_code} - {response.text}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Buying power response: %s - %s", response.status_code, response.text)
 
         if response.status_code != 200:
             raise RuntimeError(f"Failed to retrieve buying power for account {account_id}")
@@ -115,5 +259,5 @@ class QuestradeClient(PriceProtocol, OrderProtocol):
         combined = data.get("combinedBalances", [{}])[0]
         buying_power = combined.get("buyingPower", 0.0)
 
-        logger.info(f"Buying power for account {account_id}: {buying_power}")
+        logger.info("Buying power for account %s: %s", account_id, buying_power)
         return float(buying_power)
@@ -1,4 +1,4 @@
-from core.storage.db import TradingDB  # Import TradingDB class
+from core.storage.db import get_db  # Shared TradingDB per path
 from typing import Any, Optional
 from core.logger import logger
 
@@ -14,7 +14,7 @@ class Config:
     def _init_config(self):
         """Initialize with default DB path"""
         self.db_path = 'data/trading.db'
-        self.db = TradingDB(self.db_path)  # Initialize TradingDB
+        self.db = get_db(self.db_path)  # Same pool as every other caller
     
     def _cast_value(self, value: str, value_type: str) -> Any:
         """Convert string value to proper type"""
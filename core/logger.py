@@ -1,21 +1,37 @@
 # logger.py
+import atexit
 import logging
+import logging.handlers
+import queue
 from pathlib import Path
 from config.settings import BASE_DIR
 
 def setup_logger(debug=False):
-    """Configure logger with optional debug mode"""
+    """Configure logger with optional debug mode
+
+    Callers only enqueue records; a listener thread does the file and console writes.
+    """
     level = logging.DEBUG if debug else logging.INFO
     log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    
-    logging.basicConfig(
-        level=level,
-        format=log_format,
-        handlers=[
+
+    if not logging.getLogger().handlers:
+        formatter = logging.Formatter(log_format)
+        handlers = [
             logging.FileHandler(BASE_DIR / 'questrade.log'),
             logging.StreamHandler()
         ]
-    )
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(log_queue, *handlers)
+        listener.start()
+        atexit.register(listener.stop)  # Drains queued records before exit
+
+        # QueueHandler merges args into the message; the listener's handlers add the layout
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.setFormatter(logging.Formatter('%(message)s'))
+        logging.basicConfig(level=level, handlers=[queue_handler])
     return logging.getLogger(__name__)
 
 def redact_sensitive(text: str) -> str:
@@ -1,6 +1,6 @@
 from typing import List, Dict, Optional
 from dataclasses import dataclass
-from ..brokerages.protocol import PriceProtocol
+from ..brokerages.protocol import BatchPriceProtocol, PriceProtocol
 import time
 import asyncio
 from core.logger import logger
@@ -14,6 +14,9 @@ class PriceTick:
     timestamp: float  # Unix epoch
 
 class MultiProviderPriceService:
+    MAX_CONCURRENT_QUOTES = 16  # per-symbol requests in flight when a provider can't batch
+    FIRST_PRICE_TIMEOUT = 1.0  # seconds get_first_price waits for any provider
+
     def __init__(self, providers: List[PriceProtocol]):
         """
         Args:
@@ -22,6 +25,7 @@ class MultiProviderPriceService:
         self.providers = {provider.__class__.__name__.lower(): provider 
                           for provider in providers}
         self._latest_prices: Dict[str, PriceTick] = {}
+        self._quote_slots = asyncio.Semaphore(self.MAX_CONCURRENT_QUOTES)
 
     async def get_best_price(self, symbol: str) -> Optional[PriceTick]:
         """Returns the highest bid price across all providers."""
@@ -41,6 +45,67 @@ class MultiProviderPriceService:
         self._latest_prices[symbol] = best_price.price
         return best_price
 
+    async def get_first_price(self, symbol: str) -> Optional[PriceTick]:
+        """Returns the first valid price any provider delivers, cancelling the slower requests."""
+        async def quote(name: str, provider: PriceProtocol):
+            return name, await provider.get_price(symbol)
+
+        tasks = [asyncio.ensure_future(quote(name, provider))
+                 for name, provider in self.providers.items()]
+        try:
+            for next_done in asyncio.as_completed(tasks, timeout=self.FIRST_PRICE_TIMEOUT):
+                try:
+                    name, price = await next_done
+                except asyncio.TimeoutError:
+                    # Later iterations would wait forever once as_completed times out
+                    logger.warning(f"No provider quoted {symbol} within {self.FIRST_PRICE_TIMEOUT}s")
+                    break
+                except Exception as e:
+                    logger.debug(f"Provider quote failed for {symbol}: {e}")
+                    continue
+                if price:
+                    self._latest_prices[symbol] = price
+                    return PriceTick(symbol, price, name, time.time())
+        finally:
+            for task in tasks:
+                task.cancel()
+        return None
+
+    async def get_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """Returns the highest price per symbol across providers, one batch per provider."""
+        results = await asyncio.gather(
+            *(self._provider_prices(provider, symbols) for provider in self.providers.values()),
+            return_exceptions=True
+        )
+
+        best: Dict[str, float] = {}
+        for name, result in zip(self.providers, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Batch price fetch failed for {name}: {result}")
+                continue
+            for symbol, price in result.items():
+                if price is not None and price > best.get(symbol, float("-inf")):
+                    best[symbol] = price
+
+        self._latest_prices.update(best)
+        return best
+
+    async def _provider_prices(self, provider: PriceProtocol, symbols: List[str]) -> Dict[str, float]:
+        """Uses the provider's batch endpoint if it has one, else fans out get_price calls."""
+        if isinstance(provider, BatchPriceProtocol):
+            return await provider.get_prices(symbols)
+
+        async def bounded(symbol: str) -> float:
+            async with self._quote_slots:
+                return await provider.get_price(symbol)
+
+        results = await asyncio.gather(
+            *(bounded(symbol) for symbol in symbols),
+            return_exceptions=True
+        )
+        return {symbol: price for symbol, price in zip(symbols, results)
+                if not isinstance(price, Exception)}
+
     async def stream_prices(self, symbol: str, interval: float = 1.0):
         """Async generator for continuous price updates (e.g., for live trading)."""
         while True:
@@ -50,9 +115,9 @@ class MultiProviderPriceService:
             await asyncio.sleep(interval)
 
     async def get_price(self, symbol: str) -> float:
-        """Returns the current price with better error handling."""
+        """Returns the current price from whichever provider answers first."""
         try:
-            price_tick = await self.get_best_price(symbol)
+            price_tick = await self.get_first_price(symbol)
             if not price_tick:
                 logger.warning(f"No providers returned price for {symbol}")
                 return None  # Instead of raising an error
@@ -14,7 +14,7 @@ class DailyLossTracker:
     def update_pnl(self, amount):
         """Update running PnL (positive for gains, negative for losses)"""
         self.daily_pnl += amount
-        logger.info(f"Updated daily PnL: {self.daily_pnl:.2f}")
+        logger.info("Updated daily PnL: %.2f", self.daily_pnl)
     
     def is_limit_breached(self, account_value):
         """Check if daily loss limit was hit"""
@@ -1,6 +1,7 @@
 # core/risk/risk_monitor.py
 from datetime import datetime, timedelta
 from enum import Enum
+import logging
 import threading
 import time
 from typing import Dict, Literal 
@@ -15,6 +16,12 @@ from config.env import (
     TRADING_HOURS
 )
 
+# Index of each period in RiskMonitor's per-period arrays
+_PERIOD_INDEX = {period: i for i, period in enumerate(PeriodType)}
+_DAILY = _PERIOD_INDEX[PeriodType.DAILY]
+_WEEKLY = _PERIOD_INDEX[PeriodType.WEEKLY]
+_MONTHLY = _PERIOD_INDEX[PeriodType.MONTHLY]
+
 @dataclass
 class RiskReport():  # Optional data model
     pnl: float
@@ -30,68 +37,78 @@ class RiskMonitor:
             PeriodType.WEEKLY: float(WEEKLY_LOSS_LIMIT_PERCENT),
             PeriodType.MONTHLY: float(MONTHLY_LOSS_LIMIT_PERCENT)
         }
-        self.period_data = {
-            PeriodType.DAILY: {"pnl": 0.0, "breached": False, "last_reset": None},
-            PeriodType.WEEKLY: {"pnl": 0.0, "breached": False, "last_reset": None},
-            PeriodType.MONTHLY: {"pnl": 0.0, "breached": False, "last_reset": None}
-        }
-        self._lock = threading.Lock()
+        # Per-period state as parallel arrays indexed by _PERIOD_INDEX
+        self._pnl = [0.0] * len(_PERIOD_INDEX)
+        self._breached = [False] * len(_PERIOD_INDEX)
+        self._last_reset = [None] * len(_PERIOD_INDEX)
+        # Re-entrant: _reset_period takes the lock while update_pnl already holds it
+        self._lock = threading.RLock()
+        self._last_check_ns = 0  # monotonic time of the last full reset check
         self._initialize_reset_dates()
 
     def _initialize_reset_dates(self):
         """Set initial reset dates based on current time"""
         now = datetime.now()
-        self.period_data[PeriodType.DAILY]["last_reset"] = now.date()
-        self.period_data[PeriodType.WEEKLY]["last_reset"] = now - timedelta(days=now.weekday())
-        self.period_data[PeriodType.MONTHLY]["last_reset"] = now.replace(day=1)
+        self._last_reset[_DAILY] = now.date()
+        self._last_reset[_WEEKLY] = now - timedelta(days=now.weekday())
+        self._last_reset[_MONTHLY] = now.replace(day=1)
 
     def update_pnl(self, amount: float):
         """Update PnL for all periods"""
         with self._lock:
             self._check_resets()
-            for period in PeriodType:
-                self.period_data[period]["pnl"] += amount
-            logger.info(f"Updated PnL: {amount:.2f} | Current Totals - "
-                       f"Daily: {self.get_pnl(PeriodType.DAILY):.2f}, "
-                       f"Weekly: {self.get_pnl(PeriodType.WEEKLY):.2f}, "
-                       f"Monthly: {self.get_pnl(PeriodType.MONTHLY):.2f}")
+            pnl = self._pnl
+            for i in range(len(pnl)):
+                pnl[i] += amount
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Updated PnL: %.2f | Current Totals - "
+                            "Daily: %.2f, Weekly: %.2f, Monthly: %.2f",
+                            amount, pnl[_DAILY], pnl[_WEEKLY], pnl[_MONTHLY])
 
     def is_limit_breached(self, period: PeriodType, account_value: float) -> bool:
         """Check if specified period limit was hit"""
-        if self.period_data[period]["breached"]:
+        i = _PERIOD_INDEX[period]
+        if self._breached[i]:
             return True
             
-        loss_percent = abs(self.period_data[period]["pnl"]) / account_value * 100
-        if loss_percent >= self.limits[period] and self.period_data[period]["pnl"] < 0:
-            self.period_data[period]["breached"] = True
+        pnl = self._pnl[i]
+        loss_percent = abs(pnl) / account_value * 100
+        if loss_percent >= self.limits[period] and pnl < 0:
+            self._breached[i] = True
             logger.critical(
                 f"{period.value.capitalize()} loss limit breached: {loss_percent:.2f}% "
-                f"(PnL: {self.period_data[period]['pnl']:.2f}, "
+                f"(PnL: {pnl:.2f}, "
                 f"Limit: {self.limits[period]}%)"
             )
             return True
         return False
 
     def _check_resets(self):
-        """Auto-reset periods when appropriate"""
+        """Auto-reset periods when appropriate (full check at most once per second)"""
+        now_ns = time.monotonic_ns()
+        if now_ns - self._last_check_ns < 1_000_000_000:
+            return
+        self._last_check_ns = now_ns
+
         now = datetime.now()
-        if now.date() != self.period_data[PeriodType.DAILY]["last_reset"]:
+        if now.date() != self._last_reset[_DAILY]:
             if self._is_after_close(now):
                 self._reset_period(PeriodType.DAILY)
                 
-        if now - self.period_data[PeriodType.WEEKLY]["last_reset"] >= timedelta(weeks=1):
+        if now - self._last_reset[_WEEKLY] >= timedelta(weeks=1):
             self._reset_period(PeriodType.WEEKLY)
             
-        if now.month != self.period_data[PeriodType.MONTHLY]["last_reset"].month:
+        if now.month != self._last_reset[_MONTHLY].month:
             self._reset_period(PeriodType.MONTHLY)
 
     def _reset_period(self, period: PeriodType):
         """Reset tracking for a specific period"""
         with self._lock:
-            self.period_data[period]["pnl"] = 0.0
-            self.period_data[period]["breached"] = False
-            self.period_data[period]["last_reset"] = datetime.now()
-            logger.info(f"Reset {period.value} PnL tracking")
+            i = _PERIOD_INDEX[period]
+            self._pnl[i] = 0.0
+            self._breached[i] = False
+            self._last_reset[i] = datetime.now()
+            logger.info("Reset %s PnL tracking", period.value)
 
     def _is_after_close(self, dt: datetime) -> bool:
         """Check if current time is after market close"""
@@ -100,7 +117,7 @@ class RiskMonitor:
 
     def get_pnl(self, period: PeriodType) -> float:
         """Get current PnL for specified period"""
-        return self.period_data[period]["pnl"]
+        return self._pnl[_PERIOD_INDEX[period]]
     
     def get_risk_report(self) -> dict:
         """Add this method for better visibility"""
@@ -144,16 +161,16 @@ def get_risk_report(self, account_value: float) -> Dict[str, Dict[Literal['daily
         """
         report = {}
         
-        for period in PeriodType:
-            pnl = self.period_data[period]["pnl"]
+        for period, i in _PERIOD_INDEX.items():
+            pnl = self._pnl[i]
             limit = self.limits[period]
             
             report[period.value] = {
                 "pnl": pnl,
                 "limit_pct": limit,
                 "utilization_pct": abs(pnl) / account_value * 100 if account_value > 0 else 0,
-                "is_breached": self.period_data[period]["breached"],
-                "last_reset": self.period_data[period]["last_reset"]
+                "is_breached": self._breached[i],
+                "last_reset": self._last_reset[i]
             }
             
         return report
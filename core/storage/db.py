@@ -1,14 +1,35 @@
+import atexit
 import sqlite3
 import os
+import queue
+import time
 from pathlib import Path
 from contextlib import contextmanager
+from functools import lru_cache
 from core.logger import logger
 
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'schema.sql')
+_schema_sql = None
+
+def _load_schema() -> str:
+    """Read schema.sql once per process"""
+    global _schema_sql
+    if _schema_sql is None:
+        with open(SCHEMA_PATH) as f:
+            _schema_sql = f.read()
+    return _schema_sql
+
 class TradingDB:
-    def __init__(self, db_path='data/trading.db'):
+    POOL_SIZE = 4
+    IDLE_TIMEOUT = 300  # Seconds a pooled connection may sit unused before closing
+
+    def __init__(self, db_path='data/trading.db', pool_size: int = POOL_SIZE):
         self.db_path = db_path
+        # LIFO keeps recently used connections warm and lets idle ones age out
+        self._pool = queue.LifoQueue(maxsize=pool_size)
         self._ensure_data_dir()
         self._init_db()
+        atexit.register(self.close)
     
     def _ensure_data_dir(self):
         """Silently create data directory if needed"""
@@ -27,8 +48,9 @@ class TradingDB:
                     WHERE type='table' AND name='config'
                 """).fetchone()[0]
                 
+                # Always apply the schema so indexes added later reach existing databases
+                self._safe_execute_schema(conn)
                 if table_check == 0:
-                    self._safe_execute_schema(conn)
                     logger.info("Database tables created successfully")
                 else:
                     logger.debug("Database already initialized")
@@ -39,33 +61,74 @@ class TradingDB:
                 self._safe_execute_schema(conn)
 
     def _safe_execute_schema(self, conn):
-        """Execute schema while ignoring comments and empty lines"""
-        schema_path = os.path.join(os.path.dirname(__file__), 'schema.sql')
-        with open(schema_path) as f:
-            for line in f:
-                line = line.strip()
-                # Skip comments and empty lines
-                if not line or line.startswith('--'):
-                    continue
-                    
-                try:
-                    conn.execute(line)
-                except sqlite3.OperationalError as e:
-                    if "already exists" not in str(e):
-                        logger.warning(f"Skipping: {line[:60]}... (Error: {str(e)[:50]})")
+        """Execute schema.sql in one call (all statements are idempotent)"""
+        conn.executescript(_load_schema())
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new connection with per-connection PRAGMAs applied once"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        """Take a pooled connection, closing any that sat idle too long"""
+        while True:
+            try:
+                conn, last_used = self._pool.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if time.monotonic() - last_used < self.IDLE_TIMEOUT:
+                return conn
+            conn.close()
+
+    def _release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool, or close it if the pool is full"""
+        try:
+            self._pool.put_nowait((conn, time.monotonic()))
+        except queue.Full:
+            conn.close()
 
     @contextmanager
     def _get_conn(self):
-        """Get a database connection with automatic cleanup"""
+        """Get a pooled database connection; commits on success, rolls back on error"""
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.execute("PRAGMA foreign_keys = ON")
-            conn.row_factory = sqlite3.Row
+            conn = self._acquire()
             yield conn
+            conn.commit()
         except Exception as e:
             logger.critical(f"Database connection failed: {e}")
+            if conn:
+                conn.rollback()
             raise
         finally:
             if conn:
-                conn.close()
\ No newline at end of file
+                self._release(conn)
+
+    def close(self):
+        """Run PRAGMA optimize and close all pooled connections"""
+        optimized = False
+        while True:
+            try:
+                conn, _ = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            if not optimized:
+                try:
+                    conn.execute("PRAGMA optimize")
+                    optimized = True
+                except sqlite3.Error as e:
+                    logger.warning(f"PRAGMA optimize failed: {e}")
+            conn.close()
+
+def get_db(db_path: str = 'data/trading.db') -> TradingDB:
+    """Process-wide TradingDB per path, so callers share one connection pool"""
+    # Normalize so get_db() and get_db('data/trading.db') hit the same cache entry
+    return _db_for_path(os.path.abspath(db_path))
+
+@lru_cache(maxsize=None)
+def _db_for_path(db_path: str) -> TradingDB:
+    return TradingDB(db_path)
@@ -1,9 +1,13 @@
 # core/storage/reset_db.py
 import os
+import re
 import sqlite3
 from pathlib import Path
 from core.logger import logger
 
+# Standalone transaction-control statements inside the .sql files
+_TRANSACTION_STMT = re.compile(r"^\s*(BEGIN|COMMIT|END)(\s+TRANSACTION)?\s*;", re.MULTILINE | re.IGNORECASE)
+
 def reset_database():
     db_path = 'data/trading.db'
     schema_path = Path(__file__).parent / 'schema.sql'
@@ -15,18 +19,32 @@ def reset_database():
             os.remove(db_path)
             logger.info("Removed existing database")
         
-        # Create new database
-        with sqlite3.connect(db_path) as conn:
-            # Create schema
-            with open(schema_path) as f:
-                conn.executescript(f.read())
+        # Build the database in memory, where writes skip journaling entirely
+        mem = sqlite3.connect(":memory:")
+        try:
+            mem.execute("PRAGMA foreign_keys=ON")
+
+            # Create schema and insert initial data in one transaction
+            scripts = [schema_path.read_text()]
+            if init_path.exists():
+                scripts.append(init_path.read_text())
+            combined = "\n".join(_TRANSACTION_STMT.sub("", sql) for sql in scripts)
+            mem.executescript(f"BEGIN IMMEDIATE;\n{combined}\nCOMMIT;")
             logger.info("Database schema created")
-            
-            # Insert initial data
             if init_path.exists():
-                with open(init_path) as f:
-                    conn.executescript(f.read())
                 logger.info("Initial data loaded")
+
+            # Copy it to disk in page order with a single sequential write
+            disk = sqlite3.connect(db_path)
+            try:
+                mem.backup(disk)
+                disk.execute("PRAGMA journal_mode=WAL")
+                # Refresh planner statistics after the bulk load
+                disk.execute("PRAGMA optimize")
+            finally:
+                disk.close()
+        finally:
+            mem.close()
             
         return True
         
@@ -80,6 +80,10 @@ CREATE TABLE IF NOT EXISTS positions (
 );
 
 -- Indexes
-CREATE INDEX IF NOT EXISTS idx_planned_account ON planned_trades(account_id);
 CREATE INDEX IF NOT EXISTS idx_planned_expiry ON planned_trades(expiry_date);
-CREATE INDEX IF NOT EXISTS idx_positions_account ON positions(account_id);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_positions_account ON positions(account_id);
+-- Active-plan lookup: account + expiry range, then the executed_trades anti-join
+CREATE INDEX IF NOT EXISTS idx_pt_active ON planned_trades(account_id, expiry_date);
+-- idx_pt_active's account_id prefix covers account-only lookups
+DROP INDEX IF EXISTS idx_planned_account;
+CREATE INDEX IF NOT EXISTS idx_et_pt ON executed_trades(planned_trade_id, status);
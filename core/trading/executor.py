@@ -1,35 +1,68 @@
 from pathlib import Path
-from typing import List
+from typing import List, Set
 from dataclasses import asdict
+import asyncio
+import atexit
+import inspect
 import json
-from datetime import datetime
+from datetime import datetime, timezone
 from ..brokerages.protocol import OrderProtocol, FillReport
 from ..orders.bracket import BracketOrder
 from ..orders.models import OrderRequest
+from core.logger import logger
 
 class OrderExecutor:
+    _ensured_dirs: Set[Path] = set()  # log dirs already created this process
+
     def __init__(self, broker: OrderProtocol, log_dir: str = "logs/executions"):
         self.broker = broker
         self.log_dir = Path(log_dir)
-        self.log_dir.mkdir(exist_ok=True)  # Ensure dir exists
+        if self.log_dir not in OrderExecutor._ensured_dirs:
+            self.log_dir.mkdir(parents=True, exist_ok=True)  # Ensure dir exists
+            OrderExecutor._ensured_dirs.add(self.log_dir)
+        # Append handle for today's execution log, rotated on date change
+        self._log_fp = None
+        self._log_date = None
+        atexit.register(self._close_log)
+
+    def _close_log(self) -> None:
+        """Flushes and closes the current execution log file."""
+        if self._log_fp is not None:
+            self._log_fp.close()
+            self._log_fp = None
 
     async def _log_execution(self, fill_report: FillReport, order: OrderRequest) -> None:
         """Logs execution details to a JSON file."""
-        log_entry = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-            "broker": self.broker.name,  # e.g., "binance"
-            **asdict(order),  # Captures symbol, quantity, type, etc.
-            "execution_metadata": asdict(fill_report),  # Fees, slippage, latency
-            "status": fill_report.status,
-        }
-        
-        log_file = self.log_dir / f"executions_{datetime.utcnow().date()}.json"
-        with open(log_file, "a") as f:
-            f.write(json.dumps(log_entry) + "\n")
+        now = datetime.now(timezone.utc)
+        try:
+            log_entry = {
+                "timestamp": f"{now:%Y-%m-%dT%H:%M:%S.%fZ}",
+                "broker": getattr(self.broker, "name", type(self.broker).__name__),
+                **asdict(order),  # Captures symbol, quantity, type, etc.
+                "execution_metadata": asdict(fill_report),  # Fees, slippage, latency
+                "status": fill_report.status,
+            }
+
+            today = now.date()
+            if today != self._log_date:
+                self._close_log()
+                self._log_fp = open(self.log_dir / f"executions_{today}.json", "ab")
+                self._log_date = today
+            self._log_fp.write((json.dumps(log_entry, separators=(",", ":")) + "\n").encode())
+            self._log_fp.flush()
+        except Exception as e:
+            # The order is already at the broker; a lost log line must not look like a failed submit
+            logger.error(f"Failed to log execution for {order.symbol}: {e}")
+
+    async def _submit(self, order: OrderRequest) -> FillReport:
+        """Submits one order, running synchronous brokers off the event loop."""
+        if inspect.iscoroutinefunction(self.broker.submit_order):
+            return await self.broker.submit_order(order)
+        return await asyncio.to_thread(self.broker.submit_order, order)
 
     async def execute(self, order: OrderRequest) -> FillReport:
         """Submits and logs a single order."""
-        fill = await self.broker.submit_order(order)
+        fill = await self._submit(order)
         await self._log_execution(fill, order)  # Log after execution
         return fill
     
@@ -52,9 +85,10 @@ class OrderExecutor:
         # Generate OrderRequest objects from BracketOrder
         entry_order, tp_order, sl_order = bracket.to_order_requests()
         
-        # Submit all orders and return fills
-        return [
-            self.broker.submit_order(entry_order),
-            self.broker.submit_order(tp_order),
-            self.broker.submit_order(sl_order)
-        ]
\ No newline at end of file
+        # Entry goes first so no exit reaches the broker ahead of it; TP and SL then go together
+        entry_fill = await self._submit(entry_order)
+        tp_fill, sl_fill = await asyncio.gather(self._submit(tp_order), self._submit(sl_order))
+        fills = [entry_fill, tp_fill, sl_fill]
+        for fill, order in zip(fills, (entry_order, tp_order, sl_order)):
+            await self._log_execution(fill, order)
+        return fills
\ No newline at end of file
@@ -1,21 +1,36 @@
+import atexit
 import csv
 from pathlib import Path
 from datetime import datetime
+from typing import Set
 from ..brokerages.protocol import FillReport
 
 class TradeHistoryLogger:
+    _ensured_dirs: Set[Path] = set()  # log dirs already created this process
+
     def __init__(self, log_dir: Path = Path("logs")):
         self.log_dir = log_dir
-        self.log_dir.mkdir(exist_ok=True)
+        if self.log_dir not in TradeHistoryLogger._ensured_dirs:
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            TradeHistoryLogger._ensured_dirs.add(self.log_dir)
         self.log_file = log_dir / "trades.csv"
+        # One handle and writer for the logger's lifetime; each row is flushed
+        self._fp = open(self.log_file, "a", newline="")
+        self._writer = csv.writer(self._fp)
+        atexit.register(self.close)
 
     def log_fill(self, fill: FillReport):
         """Logs a fill report to CSV."""
-        with open(self.log_file, "a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                datetime.now().isoformat(),
-                fill.order_id,
-                fill.filled_at,
-                fill.status
-            ])
\ No newline at end of file
+        self._writer.writerow([
+            datetime.now().isoformat(),
+            fill.order_id,
+            fill.filled_at,
+            fill.status
+        ])
+        self._fp.flush()  # A crash must not lose recorded fills
+
+    def close(self) -> None:
+        """Flushes pending rows and closes the CSV file."""
+        if not self._fp.closed:
+            self._fp.flush()
+            self._fp.close()
@@ -1,20 +1,22 @@
+import atexit
 import json
 import os
-from datetime import datetime
+from datetime import date, datetime, timedelta, time as dt_time
 import time
 import asyncio
-import math
 
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from zoneinfo import ZoneInfo
 from core.logger import logger
 from core.orders.bracket import BracketOrder
-from core.brokerages.protocol import OrderProtocol, PriceProtocol
-from core.trading.plan import TradingPlan
+from core.brokerages.protocol import BatchPriceProtocol, OrderProtocol
 from config.env import DRY_RUN
-from core.storage.db import TradingDB
+from core.storage.db import get_db
 from core.brokerages.questrade.auth import QuestradeAuth
+from config.settings import BASE_DIR
 
 
 from config.env import (
@@ -25,6 +27,49 @@ from config.env import (
     AVAILABLE_QUANTITY_RATIO
 )
 
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_OPEN = dt_time(9, 30)
+MARKET_CLOSE = dt_time(16, 0)
+MARKET_CALENDAR_PATH = BASE_DIR / 'config' / 'market_calendar.json'
+
+
+def _load_market_calendar() -> Tuple[frozenset, Dict[date, dt_time]]:
+    """Read NYSE full-day holidays and early closes once per process"""
+    try:
+        with open(MARKET_CALENDAR_PATH) as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Market calendar unavailable, holidays not enforced: {e}")
+        return frozenset(), {}
+    holidays = frozenset(date.fromisoformat(d) for d in data.get('holidays', []))
+    early_closes = {
+        date.fromisoformat(d): dt_time.fromisoformat(t)
+        for d, t in data.get('early_closes', {}).items()
+    }
+    year = datetime.now(MARKET_TZ).year
+    if not any(d.year == year for d in holidays):
+        logger.warning(f"Market calendar has no holidays for {year}; update {MARKET_CALENDAR_PATH}")
+    return holidays, early_closes
+
+
+MARKET_HOLIDAYS, MARKET_EARLY_CLOSES = _load_market_calendar()
+
+BP_OVERRIDE_SQL = "SELECT bp_override FROM accounts WHERE account_id = ?"
+ACTIVE_PLANS_SQL = """
+    SELECT pt.planned_trade_id, pt.symbol, pt.entry_price,
+        pt.stop_loss_price, pt.expiry_date
+    FROM planned_trades pt
+    LEFT JOIN executed_trades et ON pt.planned_trade_id = et.planned_trade_id
+    WHERE pt.account_id = ?
+    AND pt.expiry_date >= DATE('now')
+    AND (et.status IS NULL OR et.status != 'filled')
+"""
+USED_BP_SQL = """
+    SELECT COALESCE(SUM(entry_price * quantity), 0)
+    FROM positions
+    WHERE account_id = ?
+"""
+
 @dataclass
 class TradingConfig:
     dry_run: bool = DRY_RUN
@@ -33,24 +78,43 @@ class TradingConfig:
     risk_of_capital: float = RISK_OF_CAPITAL
     available_quantity_ratio: float = AVAILABLE_QUANTITY_RATIO
     persist_dry_run: bool = False  # Add this new field
+    debug_per_symbol_logs: bool = False  # Also write one pretty JSON file per execution
 
 class TradingManager:
+    BP_CACHE_TTL = 30.0  # seconds a fetched buying power stays valid
+    EXECUTION_LOG_DIR = Path("logs/executions")
+    CAPITAL_RECONCILE_INTERVAL = 60.0  # seconds between DB checks of committed capital
+    KEEPALIVE_INTERVAL = 30.0  # seconds between broker pings during the session
+    MAX_INFLIGHT_ORDERS = 4  # concurrent bracket submissions per tick
+
     def __init__(
         self,
         order_client: OrderProtocol,
-        price_client: PriceProtocol
+        price_client: BatchPriceProtocol
     ):
         self.order_client = order_client
         self.price_client = price_client
-        self.active_orders: Dict[str, BracketOrder] = {}
-        self._capital_lock = asyncio.Lock()
-        self.remaining_bp = 0.0
-
         self._capital_lock = asyncio.Lock()
         self.remaining_bp = 0.0
         self.committed_capital = 0.0  # Track total committed
-
-        self.db = TradingDB()
+        self._order_slots = asyncio.Semaphore(self.MAX_INFLIGHT_ORDERS)
+        self._capital_synced_at: Optional[float] = None  # Last committed_capital DB reconcile
+        # Today's trading window as epoch seconds, recomputed once per ET day
+        self._session_open_ts = 0.0
+        self._session_close_ts = 0.0
+        self._session_valid_until = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._keepalive_task: Optional[asyncio.Task] = None
+        self._bp_cache: Optional[Tuple[float, float]] = None  # (value, monotonic expiry)
+        # Execution records are written by a background task, started on first use
+        self._log_queue: Optional[asyncio.Queue] = None
+        self._log_task: Optional[asyncio.Task] = None
+        self._exec_log_fp = None  # Today's execution log, reopened on date change
+        self._exec_log_date = None
+        os.makedirs(self.EXECUTION_LOG_DIR, exist_ok=True)
+        atexit.register(self._close_execution_log)
+
+        self.db = get_db()
         self._init_brokerage()  # Replace .env loading
         self.config = TradingConfig()
         self.auth = QuestradeAuth(self.db)  # Initialize auth
@@ -58,19 +122,61 @@ class TradingManager:
     async def run(self):
         """Main trading loop with execution tracking"""
         logger.info("Starting trading manager with execution tracking")
+        self._loop = asyncio.get_running_loop()
+        logger.info(f"Event loop: {type(self._loop).__module__}.{type(self._loop).__name__}")
+        if hasattr(self.order_client, "ping"):
+            self._keepalive_task = self._loop.create_task(self._keepalive())
         
         while True:
-            if not await self._should_trade():
-                await asyncio.sleep(60)
+            # One clock read per tick, shared by everything the tick does
+            tick_now = datetime.now()
+            if not await self._should_trade(tick_now.timestamp()):
+                # Sleep straight through to the next session instead of re-polling
+                await asyncio.sleep(self._seconds_until_open())
                 continue
             
-            # Verify existing orders first
-            await self.verify_active_orders()
-            
             # Process new plans
-            await self._process_plans()
-            await asyncio.sleep(5)  # Reduced from 60 to catch executions faster    
-        
+            await self._process_plans(now=tick_now)
+            await asyncio.sleep(5)
+
+    async def _keepalive(self):
+        """Ping the broker while the market is open so idle connections aren't dropped"""
+        while True:
+            await asyncio.sleep(self.KEEPALIVE_INTERVAL)
+            now = time.time()
+            self._refresh_session(now)
+            if not (self._session_open_ts <= now < self._session_close_ts):
+                continue
+            try:
+                await self.order_client.ping()
+            except Exception as e:
+                logger.debug(f"Keep-alive ping failed: {e}")
+
+    def _reconcile_committed_capital(self, conn, account_id: str):
+        """Resync committed_capital from positions once per CAPITAL_RECONCILE_INTERVAL"""
+        now = time.monotonic()
+        if (self._capital_synced_at is not None
+                and now - self._capital_synced_at < self.CAPITAL_RECONCILE_INTERVAL):
+            return
+
+        used_bp = conn.execute(USED_BP_SQL, (account_id,)).fetchone()[0]
+        if self._capital_synced_at is not None and abs(used_bp - self.committed_capital) > 0.01:
+            logger.warning(
+                f"Committed capital drifted: tracked {self.committed_capital:.2f}, "
+                f"positions {used_bp:.2f}"
+            )
+        self.committed_capital = used_bp
+        self._capital_synced_at = now
+
+    async def _get_buying_power_cached(self, account_id: str) -> float:
+        """Broker buying power, re-fetched at most every BP_CACHE_TTL seconds"""
+        if self._bp_cache and time.monotonic() < self._bp_cache[1]:
+            return self._bp_cache[0]
+
+        buying_power = await self.order_client.get_buying_power(account_id)
+        self._bp_cache = (buying_power, time.monotonic() + self.BP_CACHE_TTL)
+        return buying_power
+
     def _init_brokerage(self):
         """Initialize brokerage connection from database"""
         try:
@@ -111,117 +217,6 @@ class TradingManager:
             logger.critical(f"Brokerage initialization failed: {e}")
             raise
                     
-    async def _get_valid_quote(self, symbol: str, max_retries: int = 3) -> Optional[dict]:
-        """Get valid market quote with retries"""
-        for attempt in range(max_retries):
-            try:
-                response = await self.price_client.get_price(symbol)
-                if not response or 'quotes' not in response:
-                    logger.warning(f"No quote data for {symbol}")
-                    continue
-
-                quote = response['quotes'][0]
-                if not isinstance(quote, dict):
-                    logger.error(f"Invalid quote format for {symbol}")
-                    continue
-
-                # Market status checks
-                if quote.get('isHalted', False):
-                    logger.warning(f"{symbol} trading is halted")
-                    return None
-
-                last_price = quote.get('lastTradePrice')
-                if last_price is None:
-                    logger.warning(f"No last price for {symbol}")
-                    continue
-
-                # Check for stale data
-                last_trade_time = quote.get('lastTradeTime')
-                if last_trade_time:
-                    try:
-                        trade_time = datetime.fromisoformat(last_trade_time.rstrip('Z'))
-                        if (datetime.now() - trade_time).total_seconds() > 300:  # 5 minutes
-                            logger.warning(f"Stale data for {symbol} from {last_trade_time}")
-                            continue
-                    except ValueError:
-                        logger.warning(f"Invalid timestamp for {symbol}")
-
-                return quote
-
-            except Exception as e:
-                logger.warning(f"Quote attempt {attempt+1} failed for {symbol}: {str(e)}")
-                await asyncio.sleep(1)
-
-        logger.error(f"Could not get valid quote for {symbol} after {max_retries} attempts")
-        return None
-
-    async def _should_trade(self) -> bool:
-        """Check if market is open and active"""
-        now = datetime.now()
-        
-        # NYSE hours (9:30 AM to 4:00 PM ET, Monday-Friday)
-        if now.weekday() >= 5:  # Saturday or Sunday
-            logger.info("Weekend - markets closed")
-            return False
-            
-        # Convert ET to UTC (ET is UTC-4 or UTC-5 depending on DST)
-        et_hour = (now.hour - 4) % 24  # Simple UTC to ET conversion
-        if not (9 <= et_hour < 16):  # 9:30 AM-4:00 PM ET
-            logger.info(f"Outside market hours (ET time: {et_hour})")
-            return False
-            
-        # Additional checks could include:
-        # - Market holidays
-        # - Early closes
-        # - Current volatility
-        
-        return True
-    
-    async def _execute_plan_safely(self, plan: dict, bracket: BracketOrder) -> bool:
-        """Full implementation with all dependencies"""
-        symbol = plan['symbol']
-        try:
-            # Dry-run handling
-            if self.config.dry_run:
-                self._handle_dry_run_execution(plan, bracket)
-                self.log_executed_order(plan, bracket, dry_run=True)
-                return True
-
-            # Live execution flow
-            logger.info(f"Executing {symbol} qty={bracket.quantity}")
-            
-            # 1. Submit to broker
-            success = await self.order_client.submit_bracket_order(
-                bracket,
-                account_id=self.config.account_id
-            )
-            if not success:
-                logger.error(f"Broker rejected {symbol}")
-                return False
-
-            # 2. Verify execution
-            if not await self._verify_broker_execution(symbol):
-                logger.error(f"Failed verification for {symbol}")
-                return False
-
-            # 3. Get final execution price
-            filled_price = await self.order_client.get_execution_price(symbol)
-            if not filled_price:
-                logger.error(f"No execution price for {symbol}")
-                return False
-
-            # 4. Persist state
-            self._persist_executed_plan(symbol, filled_price, bracket.quantity)
-            self.log_executed_order(plan, bracket, dry_run=False)
-            
-            logger.success(f"Successfully executed {symbol} @ {filled_price}")
-            return True
-
-        except Exception as e:
-            logger.error(f"Critical error executing {symbol}: {e}")
-            await self._revert_plan_status(symbol)
-            return False
-        
     def _calculate_safe_quantity(self, bracket: BracketOrder) -> int:
         """Thread-safe quantity calculation with remaining BP"""
         if self.remaining_bp <= 0:
@@ -239,100 +234,14 @@ class TradingManager:
         max_possible = int(self.remaining_bp / bracket.entry_price)
         return min(quantity, max_possible)
 
-    async def _execute_plan(self, plan: dict, bracket: BracketOrder):
-        symbol = plan['symbol']        
-        try:
-            if self.config.dry_run:
-                self._handle_dry_run_execution(plan, bracket)
-                return
-
-            result = await self.order_client.submit_bracket_order(
-                bracket,
-                account_id=self.config.account_id
-            )
-            
-            if result.success:
-                # Mark executed and persist immediately
-                self.plan.mark_executed(plan['symbol'], bracket.entry_price)
-                self.plan.save_to_file('config/trading_plan.json')  # Immediate persistence
-                
-                self.active_orders[plan['symbol']] = bracket
-                self.log_executed_order(plan, bracket, dry_run=False)
-                logger.info(f"Order executed: {result}")
-
-        except Exception as e:
-            logger.error(f"Order failed for {plan['symbol']}: {e}")
-            # Revert execution status if needed
-            if symbol in self.plan.executed_plans:
-                self.plan.reset_execution_status(symbol)
-
-    def _handle_dry_run_execution(self, plan: dict, bracket: BracketOrder):
-        """Dry-run with full capital tracking"""
-        symbol = plan['symbol']
-        self.plan.mark_executed(symbol, bracket.entry_price, bracket.quantity)
-        self.active_orders[symbol] = bracket
-        
-        committed = bracket.entry_price * bracket.quantity
-        logger.info(
-            f"[DRY RUN] Executed {symbol} Qty:{bracket.quantity} "
-            f"Value:{committed:.2f} | BP Remaining:{self.remaining_bp - committed:.2f}"
-        )
-        self._persist_executed_plan(symbol, bracket.entry_price, bracket.quantity)
-
-    async def _handle_live_order(self, plan: dict, bracket: BracketOrder):
-        """Preserve all existing live execution logic"""
-        result = await self.order_client.submit_bracket_order(
-            bracket,
-            account_id=self.config.account_id
-        )
-        
-        if result.success:
-            self.plan.mark_executed(plan['symbol'])
-            self.active_orders[plan['symbol']] = bracket
-            self.log_executed_order(plan, bracket, dry_run=False)
-            logger.info(f"Order executed: {result}")
-        else:
-            raise Exception(f"Order submission failed: {result}")
-        
-    async def verify_active_orders(self):
-        """Check broker for order fulfillment and clean up"""
-        for symbol in list(self.active_orders.keys()):
-            try:
-                status = await self.order_client.get_order_status(symbol)
-                
-                if status == 'filled':
-                    if symbol in self.plan.executed_plans:
-                        continue  # Already processed
-                        
-                    filled_price = await self.order_client.get_execution_price(symbol)
-                    self.plan.mark_executed(symbol, filled_price)
-                    self.plan.save_to_file('config/trading_plan.json')
-                    self.active_orders.pop(symbol)
-                    
-                elif status in ['canceled', 'rejected']:
-                    logger.warning(f"Order {symbol} was {status}, releasing resources")
-                    if symbol in self.plan.executed_plans:
-                        self.plan.reset_execution_status(symbol)
-                    self.active_orders.pop(symbol)
-                    # Note: Capital will be refreshed on next _process_plans()
-
-            except Exception as e:
-                logger.error(f"Failed to verify order {symbol}: {e}")
-    
-    async def _should_trade(self) -> bool:
-            """Check market conditions"""
-            return True  # Placeholder for real logic
-
-    def _normalize_symbol(self, symbol: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _normalize_symbol(symbol: str) -> str:
         """Normalize symbol format for the price client"""
         if '/' in symbol:  # Forex pair
             return symbol.replace('/', '')
         return symbol
     
-    def _should_trigger(self, plan: dict, price: float) -> bool:
-        """Check plan-specific conditions"""
-        return True  # Placeholder for real logic
-    
     def adjust_quantity_for_capital(
         self,
         buying_power: float,
@@ -360,15 +269,17 @@ class TradingManager:
 
         quantity = min(ideal_quantity, max_affordable_quantity)
 
-        if quantity < math.ceil(ideal_quantity * available_quantity_ratio):
+        # For an int quantity, q < ceil(x) is the same test as q < x
+        if quantity < ideal_quantity * available_quantity_ratio:
             return 0
 
         return quantity
     
-    def log_executed_order(self, plan: dict, bracket: BracketOrder, dry_run: bool):
+    def log_executed_order(self, plan: dict, bracket: BracketOrder, dry_run: bool,
+                           now: Optional[datetime] = None):
         """Logs detailed execution info to JSON files"""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = (now or datetime.now()).strftime("%Y%m%d_%H%M%S")
             log_data = {
                 "symbol": plan["symbol"],
                 "timestamp": timestamp,
@@ -390,91 +301,90 @@ class TradingManager:
                 }
             }
 
-            # Ensure log directory exists
-            log_dir = Path("logs/executions")
-            log_dir.mkdir(exist_ok=True)
-            
-            # Write to daily log file
-            log_file = log_dir / f"executions_{datetime.now().date()}.json"
-            with open(log_file, "a") as f:
-                f.write(json.dumps(log_data) + "\n")
-                
-            # Also write individual execution file
-            individual_file = log_dir / f"{plan['symbol']}_{timestamp}.json"
-            with open(individual_file, "w") as f:
-                json.dump(log_data, f, indent=2)
+            self._enqueue_execution_log(log_data)
 
         except Exception as e:
             logger.error(f"Failed to log execution: {e}")
-            
-    async def _verify_order_execution(self, symbol: str) -> bool:
-        """Confirm order exists with broker"""
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                status = await self.order_client.get_order_status(symbol)
-                if status in ['filled', 'partially_filled', 'accepted']:
-                    return True
-                await asyncio.sleep(1 * (attempt + 1))  # Backoff
-            except Exception as e:
-                logger.warning(f"Verification attempt {attempt + 1} failed: {e}")
-                continue
-        return False
-    
-    async def _verify_broker_execution(self, symbol: str, timeout: int = 10) -> bool:
-        """Verify order was actually executed with broker"""
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            try:
-                status = await self.order_client.get_order_status(symbol)
-                if status == 'filled':
-                    return True
-                elif status in ['canceled', 'rejected']:
-                    logger.error(f"Order {symbol} was {status} by broker")
-                    return False
-                await asyncio.sleep(1)  # Polling interval
-            except Exception as e:
-                logger.warning(f"Verification failed for {symbol}: {e}")
-                await asyncio.sleep(2)
-        logger.error(f"Verification timeout for {symbol}")
-        return False
-    
-    def _persist_executed_plan(self, symbol: str, price: float, quantity: int):
-        """Atomic state persistence"""
-        try:
-            # Update in-memory state
-            self.plan.mark_executed(symbol, price, quantity)
-            
-            # Write to temporary file first
-            temp_path = 'config/trading_plan.json.tmp'
-            with open(temp_path, 'w') as f:
-                json.dump(self.plan.plans, f, indent=2)
-            
-            # Atomic rename
-            os.replace(temp_path, 'config/trading_plan.json')
-        except Exception as e:
-            logger.critical(f"Persistence failed: {e}")
-            raise
 
-    async def _revert_plan_status(self, symbol: str):
-        """Full rollback implementation"""
+    def _enqueue_execution_log(self, log_data: dict):
+        """Hand a record to the writer task, or write inline outside an event loop"""
         try:
-            # Cancel any open orders
-            await self.order_client.cancel_order(symbol)
-            
-            # Revert state
-            self.plan.reset_execution_status(symbol)
-            self.active_orders.pop(symbol, None)
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_execution_logs([log_data])
+            return
+
+        if self._log_queue is None:
+            self._log_queue = asyncio.Queue()
+            self._log_task = loop.create_task(self._log_writer())
+        self._log_queue.put_nowait(log_data)
+
+    async def _log_writer(self):
+        """Drain queued execution records to disk off the event loop thread"""
+        batch = []
+        try:
+            while True:
+                batch.append(await self._log_queue.get())
+                await asyncio.sleep(0.05)  # Let a burst of fills collect
+                while not self._log_queue.empty():
+                    batch.append(self._log_queue.get_nowait())
+
+                pending, batch = batch, []
+                try:
+                    await asyncio.to_thread(self._write_execution_logs, pending)
+                except Exception as e:
+                    logger.error(f"Failed to log execution: {e}")
+        finally:
+            # Don't drop records still queued at shutdown
+            while not self._log_queue.empty():
+                batch.append(self._log_queue.get_nowait())
+            if batch:
+                self._write_execution_logs(batch)
+
+    def _close_execution_log(self):
+        """Close the daily execution log handle"""
+        if self._exec_log_fp is not None:
+            self._exec_log_fp.close()
+            self._exec_log_fp = None
+            self._exec_log_date = None
+
+    def _write_execution_logs(self, batch: list):
+        """Append records to the daily log, plus per-execution files when debugging"""
+        log_dir = self.EXECUTION_LOG_DIR
+
+        # Write to daily log file
+        today = datetime.now().date()
+        if today != self._exec_log_date:
+            self._close_execution_log()
+            self._exec_log_fp = open(log_dir / f"executions_{today}.json", "a")
+            self._exec_log_date = today
+        self._exec_log_fp.writelines(
+            json.dumps(log_data, separators=(",", ":")) + "\n" for log_data in batch
+        )
+        self._exec_log_fp.flush()
+
+        if not self.config.debug_per_symbol_logs:
+            return
+
+        # Also write individual execution file
+        for log_data in batch:
+            individual_file = log_dir / f"{log_data['symbol']}_{log_data['timestamp']}.json"
+            with open(individual_file, "w") as f:
+                f.write(json.dumps(log_data, indent=2))
             
-            # Persist reverted state
-            self.plan.save_to_file('config/trading_plan.json')
-            logger.warning(f"Rolled back {symbol}")
-        except Exception as e:
-            logger.error(f"Failed to revert {symbol}: {e}")    
+    def _db_write_sync(self, *statements):
+        """Run (sql, params) statements in one transaction"""
+        with self.db._get_conn() as conn:
+            for sql, params in statements:
+                conn.execute(sql, params)
+
+    async def _db_write(self, *statements):
+        """Run DB writes on a worker thread so the event loop keeps moving"""
+        await asyncio.to_thread(self._db_write_sync, *statements)
 
     async def _execute_plan_with_db(self, plan: dict, bracket: BracketOrder) -> bool:
         """Execute trade with full DB state tracking"""
-        account_id = self.config.get('ACCOUNT_ID')
+        account_id = self.config.account_id
         symbol = plan['symbol']
         
         try:
@@ -490,23 +400,23 @@ class TradingManager:
             }
 
             # 2. Dry-run handling
-            if self.config.get('DRY_RUN') == 'TRUE':
-                with self.db._get_conn() as conn:
-                    conn.execute("""
-                        INSERT INTO executed_trades (
-                            planned_trade_id, account_id, symbol,
-                            actual_entry_price, actual_quantity, status,
-                            execution_time
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        execution_data['planned_trade_id'],
-                        account_id,
-                        symbol,
-                        execution_data['entry_price'],
-                        execution_data['quantity'],
-                        'filled',
-                        datetime.now().isoformat()
-                    ))
+            if self.config.dry_run:
+                await self._db_write(("""
+                    INSERT INTO executed_trades (
+                        planned_trade_id, account_id, symbol,
+                        actual_entry_price, actual_quantity, status,
+                        execution_time
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    execution_data['planned_trade_id'],
+                    account_id,
+                    symbol,
+                    execution_data['entry_price'],
+                    execution_data['quantity'],
+                    'filled',
+                    datetime.now().isoformat()
+                )))
+                self.log_executed_order(plan, bracket, dry_run=True)
                 return True
 
             # 3. Live execution
@@ -517,9 +427,10 @@ class TradingManager:
 
             # 4. Record execution
             if result.success:
-                with self.db._get_conn() as conn:
+                self._bp_cache = None  # Broker BP changed with this order
+                await self._db_write(
                     # Update positions
-                    conn.execute("""
+                    ("""
                         INSERT OR REPLACE INTO positions (
                             account_id, symbol, quantity, entry_price
                         ) VALUES (?, ?, ?, ?)
@@ -530,10 +441,9 @@ class TradingManager:
                         symbol,
                         execution_data['quantity'],
                         execution_data['entry_price']
-                    ))
-                    
+                    )),
                     # Record execution
-                    conn.execute("""
+                    ("""
                         INSERT INTO executed_trades (
                             planned_trade_id, account_id, symbol,
                             actual_entry_price, actual_quantity, fees,
@@ -549,7 +459,10 @@ class TradingManager:
                         'filled',
                         datetime.now().isoformat()
                     ))
-                    
+                )
+
+                self.committed_capital += execution_data['entry_price'] * execution_data['quantity']
+                self.log_executed_order(plan, bracket, dry_run=False)
                 return True
                 
             return False
@@ -557,214 +470,217 @@ class TradingManager:
         except Exception as e:
             logger.error(f"DB execution failed for {symbol}: {e}")
             # Revert position if partially executed
-            with self.db._get_conn() as conn:
-                conn.execute("""
-                    UPDATE positions
-                    SET quantity = quantity - ?
-                    WHERE account_id = ? AND symbol = ?
-                """, (
-                    execution_data['quantity'],
-                    account_id,
-                    symbol
-                ))
+            await self._db_write(("""
+                UPDATE positions
+                SET quantity = quantity - ?
+                WHERE account_id = ? AND symbol = ?
+            """, (
+                execution_data['quantity'],
+                account_id,
+                symbol
+            )))
             raise
 
+    def _read_pass_state(self, account_id: str, total_bp: Optional[float]) -> Tuple[float, list]:
+        """Blocking reads for one plan pass: BP fallback, committed capital, active plans"""
+        with self.db._get_conn() as conn:
+            if total_bp is None:
+                total_bp = conn.execute(BP_OVERRIDE_SQL, (account_id,)).fetchone()[0] or 0
+
+            # 2. Used BP comes from the running counter, checked against positions periodically
+            self._reconcile_committed_capital(conn, account_id)
+
+            # 4. Process active plans from DB
+            active_plans = conn.execute(ACTIVE_PLANS_SQL, (account_id,)).fetchall()
+
+        return total_bp, active_plans
+
+    def _fetch_active_plans(self, account_id: str) -> list:
+        """Blocking read of the account's active planned trades"""
+        with self.db._get_conn() as conn:
+            return conn.execute(ACTIVE_PLANS_SQL, (account_id,)).fetchall()
+
     async def load_plans(self, account_id: str) -> Dict[str, dict]:
         """Load trading plans from database"""
         plans = {}
         try:
-            with self.db._get_conn() as conn:
-                active_plans = conn.execute("""
-                    SELECT pt.planned_trade_id, pt.symbol, pt.entry_price, 
-                        pt.stop_loss_price, pt.expiry_date
-                    FROM planned_trades pt
-                    LEFT JOIN executed_trades et ON pt.planned_trade_id = et.planned_trade_id
-                    WHERE pt.account_id = ?
-                    AND pt.expiry_date >= DATE('now')
-                    AND (et.status IS NULL OR et.status != 'filled')
-                """, (account_id,)).fetchall()
-
-                for plan in active_plans:
-                    plans[plan['symbol']] = {
-                        'symbol': plan['symbol'],
-                        'entry': plan['entry_price'],
-                        'stop_loss': plan['stop_loss_price'],
-                        'planned_trade_id': plan['planned_trade_id'],
-                        'expiry_date': plan['expiry_date']
-                    }
+            active_plans = await asyncio.to_thread(self._fetch_active_plans, account_id)
+
+            for plan in active_plans:
+                plans[plan['symbol']] = {
+                    'symbol': plan['symbol'],
+                    'entry': plan['entry_price'],
+                    'stop_loss': plan['stop_loss_price'],
+                    'planned_trade_id': plan['planned_trade_id'],
+                    'expiry_date': plan['expiry_date']
+                }
         except Exception as e:
             logger.error(f"Failed to load plans from database: {e}")
             raise
         
         return plans
     
-    async def _process_plans(self):
+    async def _process_plans(self, now: Optional[datetime] = None):
         """Process trading plans with market status validation"""
+        now = now or datetime.now()
+        # Validate account
+        account_id = self.config.account_id
+        if not account_id:
+            logger.error("No account ID configured")
+            return
+
+        # 1. Get buying power
+        try:
+            total_bp = await self._get_buying_power_cached(account_id)
+            logger.info(f"Buying power: {total_bp}")
+        except Exception as e:
+            logger.warning(f"BP API failed: {e}, using DB fallback")
+            total_bp = None
+
+        # 3. Check market status before proceeding
+        if not await self._should_trade(now.timestamp()):
+            logger.info("Market conditions not suitable for trading")
+            return
+
+        # All reads for this pass share one pooled connection, off the event loop
+        total_bp, active_plans = await asyncio.to_thread(
+            self._read_pass_state, account_id, total_bp
+        )
+
         async with self._capital_lock:
-            # Validate account
-            account_id = self.config.account_id
-            if not account_id:
-                logger.error("No account ID configured")
+            self.remaining_bp = total_bp - self.committed_capital
+
+        # Fetch prices for every priced plan in one batch
+        symbols = list(dict.fromkeys(
+            self._normalize_symbol(plan['symbol']) for plan in active_plans
+            if None not in [plan['entry_price'], plan['stop_loss_price']]
+        ))
+        try:
+            prices = await self.price_client.get_prices(symbols)
+        except Exception as e:
+            logger.error(f"Batch price fetch failed: {e}")
+            return
+
+        # Plans are independent; only the BP bookkeeping is serialized
+        results = await asyncio.gather(
+            *(self._process_one(plan, prices) for plan in active_plans),
+            return_exceptions=True
+        )
+        for plan, result in zip(active_plans, results):
+            if isinstance(result, Exception):
+                logger.error(f"Plan failed for {plan['symbol']}: {result}")
+
+    async def _process_one(self, plan, prices: Dict[str, float]):
+        """Validate, size and execute a single active plan"""
+        symbol = plan['symbol']
+        try:
+            logger.info(f"Processing {symbol}")
+
+            # Validate required prices
+            if None in [plan['entry_price'], plan['stop_loss_price']]:
+                logger.error(f"Missing prices for {symbol}")
                 return
 
-            # 1. Get buying power
+            # Get market data; adapters already return floats
+            current_price = prices.get(self._normalize_symbol(symbol))
+            if current_price is None:
+                logger.warning(f"No price for {symbol}")
+                return
+
+            # Convert and validate plan prices
             try:
-                total_bp = await self.order_client.get_buying_power(account_id)
-                logger.info(f"Buying power: {total_bp}")
-            except Exception as e:
-                logger.warning(f"BP API failed: {e}, using DB fallback")
-                with self.db._get_conn() as conn:
-                    total_bp = conn.execute(
-                        "SELECT bp_override FROM accounts WHERE account_id = ?",
-                        (account_id,)
-                    ).fetchone()[0] or 0
-
-            # 2. Calculate used BP from positions
-            with self.db._get_conn() as conn:
-                used_bp = conn.execute("""
-                    SELECT COALESCE(SUM(entry_price * quantity), 0)
-                    FROM positions
-                    WHERE account_id = ?
-                """, (account_id,)).fetchone()[0]
-            
-            self.remaining_bp = total_bp - used_bp
+                entry_price = float(plan['entry_price'])
+                stop_loss = float(plan['stop_loss_price'])
+            except (TypeError, ValueError) as e:
+                logger.error(f"Price conversion failed for {symbol}: {e}")
+                return
 
-            # 3. Check market status before proceeding
-            if not await self._should_trade():
-                logger.info("Market conditions not suitable for trading")
+            if entry_price <= stop_loss:
+                logger.error(f"Invalid prices for {symbol}: entry {entry_price} <= stop {stop_loss}")
                 return
 
-            # 4. Process active plans from DB
-            with self.db._get_conn() as conn:
-                active_plans = conn.execute("""
-                    SELECT pt.planned_trade_id, pt.symbol, pt.entry_price, 
-                        pt.stop_loss_price, pt.expiry_date
-                    FROM planned_trades pt
-                    LEFT JOIN executed_trades et ON pt.planned_trade_id = et.planned_trade_id
-                    WHERE pt.account_id = ?
-                    AND pt.expiry_date >= DATE('now')
-                    AND (et.status IS NULL OR et.status != 'filled')
-                """, (account_id,)).fetchall()
-
-                for plan in active_plans:
-                    symbol = plan['symbol']
-                    try:
-                        logger.info(f"Processing {symbol}")
-
-                        # Validate required prices
-                        if None in [plan['entry_price'], plan['stop_loss_price']]:
-                            logger.error(f"Missing prices for {symbol}")
-                            continue
-
-                        # Get market data
-                        quote = await self._get_valid_quote(symbol)
-                        if not quote:
-                            continue
-
-                        # Convert and validate prices
-                        try:
-                            entry_price = float(plan['entry_price'])
-                            stop_loss = float(plan['stop_loss_price'])
-                            current_price = float(quote['lastTradePrice'])
-                        except (TypeError, ValueError) as e:
-                            logger.error(f"Price conversion failed for {symbol}: {e}")
-                            continue
-
-                        if entry_price <= stop_loss:
-                            logger.error(f"Invalid prices for {symbol}: entry {entry_price} <= stop {stop_loss}")
-                            continue
-
-                        # Create and execute order
-                        legacy_plan = {
-                            'symbol': symbol,
-                            'entry': entry_price,
-                            'stop_loss': stop_loss,
-                            'planned_trade_id': plan['planned_trade_id']
-                        }
-
-                        try:
-                            bracket = BracketOrder.from_plan(legacy_plan, current_price)
-                            bracket.quantity = self._calculate_safe_quantity(bracket)
-                        except Exception as e:
-                            logger.error(f"Bracket creation failed for {symbol}: {e}")
-                            continue
-
-                        # BP check
-                        required_bp = bracket.entry_price * bracket.quantity
-                        if self.remaining_bp < required_bp:
-                            logger.warning(f"Insufficient BP for {symbol}")
-                            continue
-
-                        if await self._execute_plan_with_db(legacy_plan, bracket):
-                            self.remaining_bp -= required_bp
-                            logger.info(f"Executed {symbol}")
-
-                    except Exception as e:
-                        logger.error(f"Plan failed for {symbol}: {str(e)}")
-                        continue
-
-    async def _get_valid_quote(self, symbol: str, max_retries: int = 3) -> Optional[dict]:
-        """Get valid market quote with retries"""
-        for attempt in range(max_retries):
-            try:
-                response = await self.price_client.get_price(symbol)
-                if not response or 'quotes' not in response:
-                    logger.warning(f"No quote data for {symbol}")
-                    continue
-
-                quote = response['quotes'][0]
-                if not isinstance(quote, dict):
-                    logger.error(f"Invalid quote format for {symbol}")
-                    continue
-
-                # Market status checks
-                if quote.get('isHalted', False):
-                    logger.warning(f"{symbol} trading is halted")
-                    return None
-
-                last_price = quote.get('lastTradePrice')
-                if last_price is None:
-                    logger.warning(f"No last price for {symbol}")
-                    continue
-
-                # Check for stale data
-                last_trade_time = quote.get('lastTradeTime')
-                if last_trade_time:
-                    try:
-                        trade_time = datetime.fromisoformat(last_trade_time.rstrip('Z'))
-                        if (datetime.now() - trade_time).total_seconds() > 300:  # 5 minutes
-                            logger.warning(f"Stale data for {symbol} from {last_trade_time}")
-                            continue
-                    except ValueError:
-                        logger.warning(f"Invalid timestamp for {symbol}")
-
-                return quote
+            # Create and execute order
+            legacy_plan = {
+                'symbol': symbol,
+                'entry': entry_price,
+                'stop_loss': stop_loss,
+                'planned_trade_id': plan['planned_trade_id']
+            }
 
-            except Exception as e:
-                logger.warning(f"Quote attempt {attempt+1} failed for {symbol}: {str(e)}")
-                await asyncio.sleep(1)
+            # Size and reserve BP atomically so concurrent plans can't overspend
+            async with self._capital_lock:
+                try:
+                    bracket = BracketOrder.from_plan(legacy_plan, current_price)
+                    bracket.quantity = self._calculate_safe_quantity(bracket)
+                except Exception as e:
+                    logger.error(f"Bracket creation failed for {symbol}: {e}")
+                    return
+
+                # BP check
+                required_bp = bracket.entry_price * bracket.quantity
+                if self.remaining_bp < required_bp:
+                    logger.warning(f"Insufficient BP for {symbol}")
+                    return
+                self.remaining_bp -= required_bp
+
+            executed = False
+            try:
+                async with self._order_slots:
+                    executed = await self._execute_plan_with_db(legacy_plan, bracket)
+            finally:
+                if not executed:
+                    # Hand the reservation back for other plans
+                    async with self._capital_lock:
+                        self.remaining_bp += required_bp
 
-        logger.error(f"Could not get valid quote for {symbol} after {max_retries} attempts")
-        return None
+            if executed:
+                logger.info(f"Executed {symbol}")
 
-    async def _should_trade(self) -> bool:
-        """Check if market is open and active"""
-        now = datetime.now()
-        
-        # NYSE hours (9:30 AM to 4:00 PM ET, Monday-Friday)
-        if now.weekday() >= 5:  # Saturday or Sunday
-            logger.info("Weekend - markets closed")
-            return False
-            
-        # Convert ET to UTC (ET is UTC-4 or UTC-5 depending on DST)
-        et_hour = (now.hour - 4) % 24  # Simple UTC to ET conversion
-        if not (9 <= et_hour < 16):  # 9:30 AM-4:00 PM ET
-            logger.info(f"Outside market hours (ET time: {et_hour})")
+        except Exception as e:
+            logger.error(f"Plan failed for {symbol}: {str(e)}")
+
+    def _session_bounds(self, day) -> Tuple[float, float]:
+        """Epoch open/close for an ET trading day, close pulled in by close_buffer_minutes"""
+        if day.weekday() >= 5 or day in MARKET_HOLIDAYS:
+            return 0.0, 0.0
+        close = MARKET_EARLY_CLOSES.get(day, MARKET_CLOSE)
+        open_ts = datetime.combine(day, MARKET_OPEN, MARKET_TZ).timestamp()
+        close_ts = datetime.combine(day, close, MARKET_TZ).timestamp()
+        return open_ts, close_ts - self.config.close_buffer_minutes * 60
+
+    def _refresh_session(self, now: float):
+        """Recompute today's window only after the ET date rolls over"""
+        if now < self._session_valid_until:
+            return
+        today = datetime.fromtimestamp(now, MARKET_TZ).date()
+        self._session_open_ts, self._session_close_ts = self._session_bounds(today)
+        next_midnight = datetime.combine(today + timedelta(days=1), dt_time(0), MARKET_TZ)
+        self._session_valid_until = next_midnight.timestamp()
+
+    def _seconds_until_open(self) -> float:
+        """Seconds from now until the next session opens"""
+        now = time.time()
+        day = datetime.fromtimestamp(now, MARKET_TZ).date()
+        for _ in range(7):
+            open_ts, close_ts = self._session_bounds(day)
+            if open_ts > now:
+                return open_ts - now
+            day += timedelta(days=1)
+        return 60.0  # No session found within a week; re-check shortly
+
+    async def _should_trade(self, now: Optional[float] = None) -> bool:
+        """Check if market is open and active at epoch time now (default: current time)"""
+        if now is None:
+            now = time.time()
+        self._refresh_session(now)
+
+        # NYSE hours 9:30 AM to 4:00 PM ET (DST-aware), Monday-Friday, minus
+        # exchange holidays and early closes; no new trades in the last close_buffer_minutes
+        if not (self._session_open_ts <= now < self._session_close_ts):
+            logger.info(f"Outside market hours (ET time: {datetime.fromtimestamp(now, MARKET_TZ):%a %H:%M})")
             return False
             
         # Additional checks could include:
-        # - Market holidays
-        # - Early closes
         # - Current volatility
         
-        return True    
\ No newline at end of file
+        return True
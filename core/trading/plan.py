@@ -1,8 +1,9 @@
 import json
 import os
 import shutil
+import sys
 from pathlib import Path
-from typing import Dict, List, Union, Set
+from typing import Dict, List, Optional, Union, Set
 from datetime import datetime
 from core.logger import logger
 
@@ -12,12 +13,17 @@ class TradingPlan:
         self.plans = self._normalize_input(plans)
         self.executed_plans: Set[str] = set()
         self._load_execution_status()
+        # Symbols get_active_plans returns, kept in step by mark/reset
+        self._active: Set[str] = {
+            symbol for symbol, plan in self.plans.items()
+            if plan.get('active', True) and symbol not in self.executed_plans
+        }
 
     def _normalize_input(self, plans: Union[Dict[str, dict], List[dict]]) -> Dict[str, dict]:
-        """Convert input to standardized dictionary format"""
+        """Convert input to standardized dictionary format with interned symbol keys"""
         if isinstance(plans, list):
-            return {plan['symbol']: plan for plan in plans}
-        return plans
+            return {sys.intern(plan['symbol']): plan for plan in plans}
+        return {sys.intern(symbol): plan for symbol, plan in plans.items()}
 
     def _load_execution_status(self):
         """Initialize execution tracking from existing plans"""
@@ -38,24 +44,24 @@ class TradingPlan:
 
             with open(path) as f:
                 plans = json.load(f)
-                return cls(plans)
+            return cls(plans)
 
         except Exception as e:
             logger.error(f"Failed to load trading plans: {e}")
             raise
 
     def get_active_plans(self) -> Dict[str, dict]:
-        """Get non-executed, active plans"""
-        return {
-            symbol: plan 
-            for symbol, plan in self.plans.items()
-            if plan.get('active', True) and symbol not in self.executed_plans
-        }
+        """Get non-executed, active plans in plan-file order"""
+        # Walk plans rather than the set so order doesn't follow string hashing;
+        # re-check the flag in case a caller deactivated a plan directly
+        return {symbol: plan for symbol, plan in self.plans.items()
+                if symbol in self._active and plan.get('active', True)}
 
     def reset_execution_status(self, symbol: str):
         """Re-activate a previously executed plan (for testing/recovery)"""
         if symbol in self.executed_plans:
             self.executed_plans.remove(symbol)
+            self._active.add(symbol)
             self.plans[symbol].update({
                 'active': True,
                 'executed': False,
@@ -64,16 +70,18 @@ class TradingPlan:
             })
             logger.warning(f"Reset execution status for {symbol}")
 
-    def mark_executed(self, symbol: str, price: float, quantity: int):
-        """Records execution details with quantity"""
+    def mark_executed(self, symbol: str, price: float, quantity: int,
+                      now: Optional[datetime] = None):
+        """Records execution details with quantity; now defaults to the current time"""
         if symbol not in self.plans:
             raise ValueError(f"Invalid symbol {symbol}")
             
         self.executed_plans.add(symbol)
+        self._active.discard(symbol)
         self.plans[symbol].update({
             'active': False,
             'executed': True,
-            'executed_at': datetime.now().isoformat(),
+            'executed_at': (now or datetime.now()).isoformat(),
             'execution_price': price,
             'executed_quantity': quantity,
             'committed_value': price * quantity
@@ -82,15 +90,22 @@ class TradingPlan:
     def save_to_file(self, path: str):
         """Thread-safe file persistence"""
         try:
-            # Create backup copy
+            # Hardlink the current file as the backup; os.replace below swaps in a
+            # new inode, so the link keeps the old contents without copying them
             backup_path = f"{path}.bak"
             if os.path.exists(path):
-                shutil.copyfile(path, backup_path)
+                try:
+                    if os.path.exists(backup_path):
+                        os.remove(backup_path)
+                    os.link(path, backup_path)
+                except OSError:
+                    shutil.copyfile(path, backup_path)
 
             # Atomic write procedure
             temp_path = f"{path}.tmp"
+            # One write of the full document instead of dump()'s write per fragment
             with open(temp_path, 'w') as f:
-                json.dump(self.plans, f, indent=2)
+                f.write(json.dumps(self.plans, indent=2))
             
             os.replace(temp_path, path)
             logger.info(f"Plans saved to {path}")
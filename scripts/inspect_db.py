@@ -1,11 +1,11 @@
 # inspect_db.py
-from core.storage.db import TradingDB
+from core.storage.db import get_db
 from core.logger import logger
 import pandas as pd
 
 def inspect_database():
     """Query and display all trading database tables"""
-    db = TradingDB()
+    db = get_db()
     
     with db._get_conn() as conn:
         # Get all table names
@@ -18,15 +18,13 @@ def inspect_database():
         results = {}
         for table in tables:
             table_name = table['name']
-            data = conn.execute(f"SELECT * FROM {table_name}").fetchall()
-            columns = [desc[0] for desc in conn.execute(f"PRAGMA table_info({table_name})").fetchall()]
-            
-            # Convert to pandas DataFrame for pretty printing
-            df = pd.DataFrame(data, columns=columns)
+            # Only the preview rows are read; the total comes from COUNT(*)
+            df = pd.read_sql_query(f"SELECT * FROM {table_name} LIMIT 3", conn)
+            row_count = conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
             results[table_name] = df
             
-            print(f"\n{table_name.upper()} ({len(df)} rows)")
-            print(df.head(3))  # Show first 3 rows
+            print(f"\n{table_name.upper()} ({row_count} rows)")
+            print(df)  # Show first 3 rows
     
     return results
 
@@ -1,4 +1,8 @@
 import asyncio
+try:
+    import uvloop  # Optional: faster event loop where available
+except ImportError:
+    uvloop = None
 from core.brokerages.questrade.auth import QuestradeAuth
 from core.brokerages.questrade.client import QuestradeClient
 from core.pricing.service import MultiProviderPriceService
@@ -6,11 +10,11 @@ from core.trading.manager import TradingManager
 from config import settings
 from core.config import Config
 config = Config()
-from core.storage.db import TradingDB
+from core.storage.db import get_db
 
 async def main():
     # 1. Initialize authentication
-    db = TradingDB()
+    db = get_db()
     auth = QuestradeAuth(db)
     
     # 2. Set up brokerage clients
@@ -20,11 +24,13 @@ async def main():
     # 3. Initialize TradingManager with protocol-compliant clients
     trading_manager = TradingManager(
         order_client=questrade_client,  # Must implement OrderProtocol
-        price_client=price_service     # Must implement PriceProtocol
+        price_client=price_service     # Must implement BatchPriceProtocol
     )
     
     # 4. Run the trading loop
     await trading_manager.run()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    if uvloop is not None:
+        uvloop.install()
+    asyncio.run(main())
@@ -1,25 +1,22 @@
 # scripts/verify_db.py
-import sqlite3
+from core.storage.db import get_db
 from core.logger import logger
 
 def verify_database():
     try:
-        with sqlite3.connect('data/trading.db') as conn:
-            conn.row_factory = sqlite3.Row
+        with get_db()._get_conn() as conn:
             cursor = conn.cursor()
             
-            # Check config table
+            # Check config table; rows are streamed from the cursor, not fetched up front
             cursor.execute("SELECT key, value, description FROM config")
-            configs = cursor.fetchall()
             logger.info("\nCONFIGURATION:")
-            for row in configs:
+            for row in cursor:
                 logger.info(f"{row['key']}: {row['value']} ({row['description']})")
             
             # Check brokerages
             cursor.execute("SELECT id, name, token_url, api_endpoint FROM brokerages")
-            brokerages = cursor.fetchall()
             logger.info("\nBROKERAGES:")
-            for row in brokerages:
+            for row in cursor:
                 logger.info(f"{row['id']}: {row['name']}")
                 logger.info(f"  Token URL: {row['token_url']}")
                 logger.info(f"  API Endpoint: {row['api_endpoint']}")
@@ -30,9 +27,8 @@ def verify_database():
                 FROM accounts a
                 JOIN brokerages b ON a.brokerage_id = b.id
             """)
-            accounts = cursor.fetchall()
             logger.info("\nACCOUNTS:")
-            for row in accounts:
+            for row in cursor:
                 logger.info(f"{row['account_id']}: {row['account_name']} ({row['brokerage_name']})")
             
             return True